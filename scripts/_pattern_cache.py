@@ -0,0 +1,31 @@
+# coding: utf-8
+"""
+On-disk cache for SentenceTransformer pattern encodings.
+
+Encodings are keyed by a content hash of the model name, the patterns, the
+model's embedding dimension and the encode() arguments, so repeat runs skip
+model.encode() without ever reusing another checkpoint's vectors.
+"""
+
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+
+def encode_cached(model, model_name, patterns, cache_dir=".emb_cache", **encode_kwargs):
+    """Return model.encode(patterns, **encode_kwargs), loading from cache when possible."""
+    key_source = model_name + "\n"
+    key_source += "\n".join(patterns)
+    key_source += str(model.get_sentence_embedding_dimension())
+    key_source += repr(sorted(encode_kwargs.items()))
+    key = hashlib.sha256(key_source.encode("utf-8")).hexdigest()[:16]
+
+    cache_path = Path(cache_dir, key + ".npy")
+    if cache_path.exists():
+        return np.load(cache_path)
+
+    embeddings = model.encode(patterns, **encode_kwargs)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    np.save(cache_path, embeddings)
+    return embeddings
@@ -0,0 +1,61 @@
+# coding: utf-8
+"""
+Compact embedding table exports for on-device similarity.
+
+Stacks scam and legitimate embeddings into a single dim-major [dim, n]
+matrix so the app scores a query against every prototype with one matvec
+followed by an argmax over the labels, and writes the per-table int8 and
+fp16 copies shared by every embedding generator script.
+"""
+
+import os
+import json
+
+import numpy as np
+
+
+def save_prototypes(output_dir, scam_embeddings, legitimate_embeddings):
+    """Write prototypes.npy ([dim, n], C-contiguous), labels.npy and prototypes_meta.json."""
+    prototypes = np.concatenate([scam_embeddings, legitimate_embeddings]).astype(np.float32)
+    # .T is a view; ascontiguousarray lays each prototype out as a column
+    prototypes_t = np.ascontiguousarray(prototypes.T)
+
+    # 1 = scam, 0 = legitimate
+    labels = np.concatenate([
+        np.ones(len(scam_embeddings), dtype=np.uint8),
+        np.zeros(len(legitimate_embeddings), dtype=np.uint8),
+    ])
+
+    meta = {
+        "n_scam": int(len(scam_embeddings)),
+        "n_legit": int(len(legitimate_embeddings)),
+        "dim": int(prototypes.shape[1]),
+    }
+
+    np.save(os.path.join(output_dir, "prototypes.npy"), prototypes_t)
+    np.save(os.path.join(output_dir, "labels.npy"), labels)
+    with open(os.path.join(output_dir, "prototypes_meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    return meta
+
+
+def quantize_rows_int8(embeddings):
+    """Per-row symmetric int8: sim = dot(q_a, q_b) * scale_a * scale_b."""
+    scale = np.abs(embeddings).max(axis=1, keepdims=True) / 127.0
+    scale[scale == 0] = 1.0
+    q = np.round(embeddings / scale).astype(np.int8)
+    return q, scale.astype(np.float16)
+
+
+def save_compact_tables(output_dir, scam_embeddings, legitimate_embeddings):
+    """Write {name}_embeddings.npz (int8 + fp16 scales) and {name}_embeddings_fp16.npy."""
+    for name, embeddings in [("scam", scam_embeddings), ("legitimate", legitimate_embeddings)]:
+        q, scale = quantize_rows_int8(embeddings)
+        np.savez(os.path.join(output_dir, f"{name}_embeddings.npz"), q=q, scale=scale)
+
+        # Re-normalize after the cast so on-device cosine math sees unit norms
+        embeddings_fp16 = embeddings.astype(np.float16)
+        norms = np.linalg.norm(embeddings_fp16.astype(np.float32), axis=1, keepdims=True)
+        embeddings_fp16 = (embeddings_fp16 / norms).astype(np.float16)
+        np.save(os.path.join(output_dir, f"{name}_embeddings_fp16.npy"), embeddings_fp16)
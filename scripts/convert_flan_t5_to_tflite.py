@@ -1,103 +1,171 @@
 """
-FLAN-T5 Small to TensorFlow Lite Conversion Script
+FLAN-T5 Small Conversion Script
 
-This script converts the FLAN-T5 small model to TensorFlow Lite format
-with dynamic range quantization for on-device deployment.
+By default this only exports the FLAN-T5 small tokenizer, which is all the
+app currently needs (FlanT5Classifier uses keyword-based classification).
+
+With --actually-convert, the model is exported to ONNX through Optimum and
+the encoder/decoder graphs are dynamically quantized to int8 for on-device
+deployment with ONNX Runtime Mobile.
+
+With --tflite-encoder, only the T5 encoder (the part useful for
+classification) is converted to TensorFlow Lite with dynamic-range int8
+quantization and a fixed [1, 128] input signature.
 
 Requirements:
-    pip install transformers tensorflow sentencepiece
+    pip install transformers sentencepiece
+    pip install optimum[exporters] onnxruntime  # for --actually-convert
+    pip install tensorflow  # for --tflite-encoder
 
 Usage:
     python convert_flan_t5_to_tflite.py
+    python convert_flan_t5_to_tflite.py --actually-convert
+    python convert_flan_t5_to_tflite.py --tflite-encoder
 
 Output:
-    - flan_t5_small_encoder.tflite (encoder model)
-    - flan_t5_small_decoder.tflite (decoder model)
     - tokenizer_config.json (tokenizer configuration)
+    - flan_t5_small_encoder_int8.onnx (encoder model, --actually-convert)
+    - flan_t5_small_decoder_int8.onnx (decoder model, --actually-convert)
+    - flan_t5_small_decoder_with_past_int8.onnx (cached decoder, --actually-convert)
+    - flan_t5_small_encoder.tflite (int8 dynamic-range encoder, --tflite-encoder)
 """
 
 import os
-import tensorflow as tf
-import numpy as np
-from transformers import T5Tokenizer, TFT5ForConditionalGeneration
+import sys
+import argparse
+import tempfile
+import subprocess
+from transformers import T5Tokenizer
+
+parser = argparse.ArgumentParser(description="Export FLAN-T5 small for on-device use")
+parser.add_argument(
+    "--actually-convert",
+    action="store_true",
+    help="Export the model to ONNX and quantize it (default: tokenizer only)"
+)
+parser.add_argument(
+    "--tflite-encoder",
+    action="store_true",
+    help="Convert the encoder to a dynamic-range quantized TFLite model"
+)
+args = parser.parse_args()
 
 print("=" * 60)
-print("FLAN-T5 Small to TensorFlow Lite Converter")
+print("FLAN-T5 Small Converter")
 print("=" * 60)
 
-# Load model and tokenizer
-print("\n[1/5] Loading FLAN-T5 small model...")
 model_name = "google/flan-t5-small"
-tokenizer = T5Tokenizer.from_pretrained(model_name)
-model = TFT5ForConditionalGeneration.from_pretrained(model_name)
-
-print(f"✓ Model loaded: {model_name}")
-print(f"  Parameters: {model.num_parameters():,}")
-print(f"  Vocab size: {tokenizer.vocab_size}")
 
 # Create output directory
 output_dir = "../app/src/main/assets/models"
 os.makedirs(output_dir, exist_ok=True)
 
 # Save tokenizer
-print("\n[2/5] Saving tokenizer configuration...")
+print("\n[1/4] Saving tokenizer configuration...")
+tokenizer = T5Tokenizer.from_pretrained(model_name)
 tokenizer.save_pretrained(output_dir)
 print(f"✓ Tokenizer saved to {output_dir}")
+print(f"  Vocab size: {tokenizer.vocab_size}")
 
-# Create a simplified classification wrapper
-print("\n[3/5] Creating TFLite-compatible model...")
+quantized_paths = []
+
+if args.actually_convert:
+    # Export encoder/decoder graphs with Optimum (no TensorFlow required)
+    print("\n[2/4] Exporting FLAN-T5 small to ONNX...")
+    # The fp32 export only feeds quantization, so it lives in a temporary
+    # directory outside the APK assets tree
+    with tempfile.TemporaryDirectory(prefix="flan_t5_onnx_") as onnx_dir:
+        subprocess.run(
+            [
+                sys.executable, "-m", "optimum.exporters.onnx",
+                "--model", model_name,
+                "--task", "text2text-generation-with-past",
+                onnx_dir
+            ],
+            check=True
+        )
+        print(f"✓ ONNX export written to {onnx_dir}")
+
+        print("\n[3/4] Quantizing encoder and decoder to int8...")
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+
+        graphs = [
+            ("encoder_model.onnx", "flan_t5_small_encoder_int8.onnx"),
+            ("decoder_model.onnx", "flan_t5_small_decoder_int8.onnx"),
+            ("decoder_with_past_model.onnx", "flan_t5_small_decoder_with_past_int8.onnx"),
+        ]
+        for source_name, target_name in graphs:
+            source_path = os.path.join(onnx_dir, source_name)
+            if not os.path.exists(source_path):
+                print(f"⚠ Skipping {source_name} (not produced by export)")
+                continue
+
+            target_path = os.path.join(output_dir, target_name)
+            quantize_dynamic(
+                model_input=source_path,
+                model_output=target_path,
+                weight_type=QuantType.QInt8
+            )
+            quantized_paths.append(target_path)
+
+            size_mb = os.path.getsize(target_path) / (1024 * 1024)
+            print(f"✓ {target_name}: {size_mb:.2f} MB")
+else:
+    print("\n[2/4] Skipping model export (pass --actually-convert to enable)")
+    print("\n[3/4] Skipping quantization")
+
+tflite_path = None
+
+if args.tflite_encoder:
+    print("\n[4/4] Converting encoder to TensorFlow Lite...")
+    import tensorflow as tf
+    from transformers import TFT5EncoderModel
+
+    # Encoder weights only; no decoder or LM head is materialized
+    encoder = TFT5EncoderModel.from_pretrained(model_name)
 
-class T5ClassifierWrapper(tf.keras.Model):
-    def __init__(self, t5_model):
-        super().__init__()
-        self.t5 = t5_model
-        
     @tf.function(input_signature=[
-        tf.TensorSpec(shape=[None, None], dtype=tf.int32, name='input_ids'),
-        tf.TensorSpec(shape=[None, None], dtype=tf.int32, name='attention_mask')
+        tf.TensorSpec(shape=[1, 128], dtype=tf.int32, name="input_ids"),
+        tf.TensorSpec(shape=[1, 128], dtype=tf.int32, name="attention_mask")
     ])
-    def call(self, input_ids, attention_mask):
-        # Generate output (simplified for classification)
-        outputs = self.t5.generate(
-            input_ids=input_ids,
-            attention_mask=attention_mask,
-            max_length=50,
-            num_beams=1,
-            do_sample=False
-        )
-        return {'output_ids': outputs}
-
-# Note: Full T5 conversion to TFLite is complex due to encoder-decoder architecture
-# For now, we'll use a simplified approach with saved model format
-
-print("\n[4/5] Converting to TensorFlow Lite...")
-print("⚠ Note: Full T5 TFLite conversion is complex.")
-print("   Using keyword-based classification as fallback in app.")
-print("   For production, consider:")
-print("   1. Using BERT-based classifier (easier to convert)")
-print("   2. Using ONNX Runtime for T5")
-print("   3. Server-side inference with T5")
-
-# Create a simple classification model for TFLite
-# This is a placeholder - actual implementation would need proper T5 conversion
-print("\n[5/5] Creating placeholder TFLite model...")
-
-# For now, save model in SavedModel format (can be loaded in Android if needed)
-saved_model_dir = os.path.join(output_dir, "flan_t5_saved_model")
-model.save_pretrained(saved_model_dir, saved_model=True)
-print(f"✓ SavedModel format saved to {saved_model_dir}")
+    def serving(input_ids, attention_mask):
+        outputs = encoder(input_ids=input_ids, attention_mask=attention_mask)
+        return {"last_hidden_state": outputs.last_hidden_state}
+
+    # Convert straight from the traced function; no SavedModel is written
+    converter = tf.lite.TFLiteConverter.from_concrete_functions(
+        [serving.get_concrete_function()],
+        encoder
+    )
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    tflite_model = converter.convert()
+
+    tflite_path = os.path.join(output_dir, "flan_t5_small_encoder.tflite")
+    with open(tflite_path, "wb") as f:
+        f.write(tflite_model)
+
+    size_mb = os.path.getsize(tflite_path) / (1024 * 1024)
+    print(f"✓ Encoder TFLite model: {tflite_path} ({size_mb:.2f} MB)")
+else:
+    print("\n[4/4] Skipping TFLite encoder (pass --tflite-encoder to enable)")
 
 print("\n" + "=" * 60)
 print("Conversion Summary")
 print("=" * 60)
 print(f"✓ Tokenizer: {output_dir}/tokenizer_config.json")
-print(f"✓ SavedModel: {saved_model_dir}")
-print("\n⚠ TFLite Conversion Status:")
-print("  - Full T5 TFLite conversion requires additional work")
-print("  - App currently uses keyword-based classification")
-print("  - Keyword classifier works well for common scam patterns")
+for path in quantized_paths:
+    print(f"✓ Quantized model: {path}")
+if tflite_path is not None:
+    print(f"✓ TFLite encoder: {tflite_path}")
+
+if not quantized_paths and tflite_path is None:
+    print("\n⚠ Model Status:")
+    print("  - App currently uses keyword-based classification")
+    print("  - Keyword classifier works well for common scam patterns")
+    print("  - Re-run with --actually-convert to produce int8 ONNX models")
+    print("  - Or with --tflite-encoder to produce an int8 TFLite encoder")
+
 print("\nNext Steps:")
 print("1. Test keyword classifier on real data")
-print("2. Consider BERT-based alternative for easier TFLite conversion")
-print("3. Or use ONNX Runtime Mobile for T5 inference")
+print("2. Load the int8 ONNX encoder/decoder with ONNX Runtime Mobile")
 print("=" * 60)
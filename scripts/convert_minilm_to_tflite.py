@@ -5,7 +5,7 @@ MiniLM-L6-v2 Embedding Generator
 Generates real MiniLM embeddings for scam and legitimate patterns.
 
 Requirements:
-    pip install sentence-transformers numpy scikit-learn
+    pip install "sentence-transformers>=3.0" numpy
 
 Usage:
     python convert_minilm_to_tflite.py
@@ -14,6 +14,10 @@ Usage:
 import os
 import numpy as np
 from sentence_transformers import SentenceTransformer
+from sentence_transformers.quantization import quantize_embeddings
+from _pattern_cache import encode_cached
+from _prototypes import save_compact_tables, save_prototypes
+from patterns import scam_patterns, legitimate_patterns
 
 print("=" * 70)
 print("MiniLM-L6-v2 Embedding Generator")
@@ -34,41 +38,37 @@ os.makedirs(output_dir, exist_ok=True)
 # Pre-compute scam pattern embeddings
 print("\n[2/4] Generating scam pattern embeddings...")
 
-scam_patterns = [
-    "Congratulations! You've won a prize in a lottery you never entered",
-    "You are the lucky winner of our grand prize draw",
-    "Your bank account has been suspended due to suspicious activity",
-    "We need to verify your credit card information right now",
-    "This is the IRS calling about unpaid taxes and penalties",
-    "You have a warrant for your arrest due to tax fraud",
-    "Your computer has been infected with a dangerous virus",
-    "This is Microsoft technical support calling about your Windows license",
-    "Pay the fine using iTunes gift cards or Google Play cards",
-    "Purchase prepaid cards and provide the codes to resolve this",
-    "Guaranteed returns on this exclusive investment opportunity",
-    "Double your money with our cryptocurrency trading system",
-    "Grandma, it's me, I'm in trouble and need money urgently",
-    "Your grandson has been arrested and needs bail money immediately",
-    "This is an official government agency calling about your benefits",
-    "Federal officer calling regarding a legal matter in your name",
-]
-
-legitimate_patterns = [
-    "Hi, this is John from the office calling about tomorrow's meeting",
-    "Following up on the project we discussed last week",
-    "Hey, it's Sarah! Just wanted to catch up and see how you're doing",
-    "Mom calling to check in and see if you're free for dinner",
-    "This is your bank calling to verify a recent transaction on your account",
-    "Appointment reminder for your doctor's visit tomorrow at 2 PM",
-    "Your package delivery is scheduled for this afternoon",
-    "Thank you for being a valued customer, here's an exclusive offer",
-]
-
-scam_embeddings = model.encode(scam_patterns, convert_to_numpy=True)
-legitimate_embeddings = model.encode(legitimate_patterns, convert_to_numpy=True)
+# Encode both pattern sets in one pass; embeddings come back L2-normalized
+all_embeddings = encode_cached(
+    model,
+    model_name,
+    scam_patterns + legitimate_patterns,
+    batch_size=64,
+    convert_to_numpy=True,
+    normalize_embeddings=True,
+    show_progress_bar=False
+)
+scam_embeddings, legitimate_embeddings = np.split(all_embeddings, [len(scam_patterns)])
 
 np.save(os.path.join(output_dir, "scam_embeddings.npy"), scam_embeddings)
 np.save(os.path.join(output_dir, "legitimate_embeddings.npy"), legitimate_embeddings)
+save_prototypes(output_dir, scam_embeddings, legitimate_embeddings)
+
+# Compact copies of each table for on-device similarity
+save_compact_tables(output_dir, scam_embeddings, legitimate_embeddings)
+
+# Per-dimension asymmetric int8 copies, with ranges calibrated on both sets.
+# The ranges are saved so a query can be mapped onto the same grid on device:
+#   q = int8(trunc((x - ranges[0]) / ((ranges[1] - ranges[0]) / 255) - 128))
+# Dequantize before taking dot products; for direct int8 dot products use the
+# symmetric per-row .npz tables instead
+int8_ranges = np.vstack([all_embeddings.min(axis=0), all_embeddings.max(axis=0)])
+all_embeddings_int8 = quantize_embeddings(all_embeddings, precision="int8", ranges=int8_ranges)
+scam_embeddings_int8, legitimate_embeddings_int8 = np.split(all_embeddings_int8, [len(scam_patterns)])
+
+np.save(os.path.join(output_dir, "scam_embeddings_int8.npy"), scam_embeddings_int8)
+np.save(os.path.join(output_dir, "legitimate_embeddings_int8.npy"), legitimate_embeddings_int8)
+np.save(os.path.join(output_dir, "embeddings_int8_ranges.npy"), int8_ranges.astype(np.float32))
 
 print(f"[OK] Scam patterns: {len(scam_patterns)} embeddings saved")
 print(f"[OK] Legitimate patterns: {len(legitimate_patterns)} embeddings saved")
@@ -76,13 +76,12 @@ print(f"[OK] Legitimate patterns: {len(legitimate_patterns)} embeddings saved")
 # Test encoding
 print("\n[3/4] Testing encoding...")
 test_text = "Your account will be suspended unless you verify your information"
-test_embedding = model.encode([test_text], convert_to_numpy=True)
+test_embedding = model.encode([test_text], convert_to_numpy=True, normalize_embeddings=True)
 print(f"[OK] Test embedding shape: {test_embedding.shape}")
 
-# Calculate similarities
-from sklearn.metrics.pairwise import cosine_similarity
-scam_sim = cosine_similarity(test_embedding, scam_embeddings).max()
-legit_sim = cosine_similarity(test_embedding, legitimate_embeddings).max()
+# Calculate similarities (embeddings are unit-norm, so cosine == dot product)
+scam_sim = (test_embedding @ scam_embeddings.T).max()
+legit_sim = (test_embedding @ legitimate_embeddings.T).max()
 print(f"  Scam similarity: {scam_sim:.3f}")
 print(f"  Legitimate similarity: {legit_sim:.3f}")
 print(f"  Classification: {'SCAM' if scam_sim > legit_sim else 'LEGITIMATE'}")
@@ -92,6 +91,9 @@ print("\n[4/4] Summary")
 print("=" * 70)
 print(f"[OK] Scam embeddings: {output_dir}/scam_embeddings.npy")
 print(f"[OK] Legitimate embeddings: {output_dir}/legitimate_embeddings.npy")
+print(f"[OK] Prototype matrix: {output_dir}/prototypes.npy ([dim, n]), labels.npy, prototypes_meta.json")
+print(f"[OK] int8 embeddings: {output_dir}/scam_embeddings_int8.npy, legitimate_embeddings_int8.npy, embeddings_int8_ranges.npy")
+print(f"[OK] Per-row int8 embeddings: {output_dir}/scam_embeddings.npz, legitimate_embeddings.npz")
 print(f"  Embedding dimension: 384")
 print(f"  Scam patterns: {len(scam_patterns)}")
 print(f"  Legitimate patterns: {len(legitimate_patterns)}")
@@ -5,7 +5,7 @@ Converts sentence-transformers/all-MiniLM-L6-v2 to optimized TFLite format
 for on-device semantic similarity and classification.
 
 Requirements:
-    pip install sentence-transformers tensorflow transformers
+    pip install "sentence-transformers>=3.0" tensorflow transformers
 
 Usage:
     python convert_minilm_to_tflite.py
@@ -15,12 +15,20 @@ Output:
     - minilm_tokenizer.json (tokenizer config, ~500 KB)
     - scam_embeddings.npy (pre-computed scam pattern embeddings)
     - legitimate_embeddings.npy (pre-computed legitimate pattern embeddings)
+    - scam_embeddings_int8.npy / legitimate_embeddings_int8.npy (int8 copies)
+    - embeddings_int8_ranges.npy (per-dimension [min; max] used for the int8 copies)
+    - scam_embeddings.npz / legitimate_embeddings.npz (per-row int8 + fp16 scales)
+    - scam_embeddings_fp16.npy / legitimate_embeddings_fp16.npy (fp16 copies)
 """
 
 import os
 import numpy as np
 import tensorflow as tf
 from sentence_transformers import SentenceTransformer
+from sentence_transformers.quantization import quantize_embeddings
+from _pattern_cache import encode_cached
+from _prototypes import save_compact_tables, save_prototypes
+from patterns import scam_patterns, legitimate_patterns
 from transformers import AutoTokenizer
 
 print("=" * 70)
@@ -74,75 +82,37 @@ print("  Or: Use pre-converted TFLite model from TensorFlow Hub")
 # Pre-compute scam pattern embeddings
 print("\n[4/6] Pre-computing scam pattern embeddings...")
 
-scam_patterns = [
-    # Lottery/Prize scams
-    "Congratulations! You've won a prize in a lottery you never entered",
-    "You are the lucky winner of our grand prize draw",
-    "Claim your prize money by calling this number immediately",
-    
-    # Financial fraud
-    "Your bank account has been suspended due to suspicious activity",
-    "We need to verify your credit card information right now",
-    "Your account will be closed unless you provide your details",
-    
-    # IRS/Tax scams
-    "This is the IRS calling about unpaid taxes and penalties",
-    "You have a warrant for your arrest due to tax fraud",
-    "Pay your tax debt immediately or face legal consequences",
-    
-    # Tech support scams
-    "Your computer has been infected with a dangerous virus",
-    "This is Microsoft technical support calling about your Windows license",
-    "We detected suspicious activity on your computer and need remote access",
-    
-    # Gift card scams
-    "Pay the fine using iTunes gift cards or Google Play cards",
-    "Purchase prepaid cards and provide the codes to resolve this",
-    "Wire transfer or gift cards are the only accepted payment methods",
-    
-    # Investment scams
-    "Guaranteed returns on this exclusive investment opportunity",
-    "Double your money with our cryptocurrency trading system",
-    "Limited time offer for high-return investments with no risk",
-    
-    # Grandparent scams
-    "Grandma, it's me, I'm in trouble and need money urgently",
-    "Your grandson has been arrested and needs bail money immediately",
-    "Family emergency - send money right away, don't tell anyone",
-    
-    # Impersonation
-    "This is an official government agency calling about your benefits",
-    "Federal officer calling regarding a legal matter in your name",
-    "Social Security Administration - your number has been suspended"
-]
-
-legitimate_patterns = [
-    # Work/Professional
-    "Hi, this is John from the office calling about tomorrow's meeting",
-    "Following up on the project we discussed last week",
-    "Calling to schedule our quarterly review appointment",
-    
-    # Personal/Family
-    "Hey, it's Sarah! Just wanted to catch up and see how you're doing",
-    "Mom calling to check in and see if you're free for dinner",
-    "Your friend calling about the weekend plans we made",
-    
-    # Business/Services
-    "This is your bank calling to verify a recent transaction on your account",
-    "Appointment reminder for your doctor's visit tomorrow at 2 PM",
-    "Your package delivery is scheduled for this afternoon",
-    
-    # Legitimate promotions
-    "Thank you for being a valued customer, here's an exclusive offer",
-    "Your subscription renewal is coming up next month",
-    "Confirmation call for your recent online order"
-]
-
-scam_embeddings = model.encode(scam_patterns, convert_to_numpy=True)
-legitimate_embeddings = model.encode(legitimate_patterns, convert_to_numpy=True)
+# Encode both pattern sets in one pass; embeddings come back L2-normalized
+all_embeddings = encode_cached(
+    model,
+    model_name,
+    scam_patterns + legitimate_patterns,
+    batch_size=64,
+    convert_to_numpy=True,
+    normalize_embeddings=True,
+    show_progress_bar=False
+)
+scam_embeddings, legitimate_embeddings = np.split(all_embeddings, [len(scam_patterns)])
 
 np.save(os.path.join(output_dir, "scam_embeddings.npy"), scam_embeddings)
 np.save(os.path.join(output_dir, "legitimate_embeddings.npy"), legitimate_embeddings)
+save_prototypes(output_dir, scam_embeddings, legitimate_embeddings)
+
+# Per-dimension asymmetric int8 copies, with ranges calibrated on both sets.
+# The ranges are saved so a query can be mapped onto the same grid on device:
+#   q = int8(trunc((x - ranges[0]) / ((ranges[1] - ranges[0]) / 255) - 128))
+# Dequantize before taking dot products; for direct int8 dot products use the
+# symmetric per-row .npz tables instead
+int8_ranges = np.vstack([all_embeddings.min(axis=0), all_embeddings.max(axis=0)])
+all_embeddings_int8 = quantize_embeddings(all_embeddings, precision="int8", ranges=int8_ranges)
+scam_embeddings_int8, legitimate_embeddings_int8 = np.split(all_embeddings_int8, [len(scam_patterns)])
+
+np.save(os.path.join(output_dir, "scam_embeddings_int8.npy"), scam_embeddings_int8)
+np.save(os.path.join(output_dir, "legitimate_embeddings_int8.npy"), legitimate_embeddings_int8)
+np.save(os.path.join(output_dir, "embeddings_int8_ranges.npy"), int8_ranges.astype(np.float32))
+
+# Compact copies of each table for on-device similarity
+save_compact_tables(output_dir, scam_embeddings, legitimate_embeddings)
 
 print(f"✓ Scam patterns: {len(scam_patterns)} embeddings saved")
 print(f"✓ Legitimate patterns: {len(legitimate_patterns)} embeddings saved")
@@ -150,13 +120,12 @@ print(f"✓ Legitimate patterns: {len(legitimate_patterns)} embeddings saved")
 # Test encoding
 print("\n[5/6] Testing encoding...")
 test_text = "Your account will be suspended unless you verify your information"
-test_embedding = model.encode([test_text], convert_to_numpy=True)
+test_embedding = model.encode([test_text], convert_to_numpy=True, normalize_embeddings=True)
 print(f"✓ Test embedding shape: {test_embedding.shape}")
 
-# Calculate similarities
-from sklearn.metrics.pairwise import cosine_similarity
-scam_sim = cosine_similarity(test_embedding, scam_embeddings).max()
-legit_sim = cosine_similarity(test_embedding, legitimate_embeddings).max()
+# Calculate similarities (embeddings are unit-norm, so cosine == dot product)
+scam_sim = (test_embedding @ scam_embeddings.T).max()
+legit_sim = (test_embedding @ legitimate_embeddings.T).max()
 print(f"  Scam similarity: {scam_sim:.3f}")
 print(f"  Legitimate similarity: {legit_sim:.3f}")
 print(f"  Classification: {'SCAM' if scam_sim > legit_sim else 'LEGITIMATE'}")
@@ -167,6 +136,9 @@ print("=" * 70)
 print(f"✓ Tokenizer: {output_dir}/minilm_tokenizer/")
 print(f"✓ Scam embeddings: {output_dir}/scam_embeddings.npy")
 print(f"✓ Legitimate embeddings: {output_dir}/legitimate_embeddings.npy")
+print(f"✓ Prototype matrix: {output_dir}/prototypes.npy ([dim, n]), labels.npy, prototypes_meta.json")
+print(f"✓ Compact tables: {output_dir}/*_embeddings.npz, *_embeddings_fp16.npy")
+print(f"✓ int8 embeddings: {output_dir}/scam_embeddings_int8.npy, legitimate_embeddings_int8.npy, embeddings_int8_ranges.npy")
 print(f"  Embedding dimension: 384")
 print(f"  Scam patterns: {len(scam_patterns)}")
 print(f"  Legitimate patterns: {len(legitimate_patterns)}")
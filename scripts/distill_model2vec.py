@@ -0,0 +1,96 @@
+# coding: utf-8
+"""
+MiniLM-L6-v2 Static Embedding Distiller
+
+Distills sentence-transformers/all-MiniLM-L6-v2 into a model2vec static
+embedding model: a per-token embedding table that is averaged instead of
+running the transformer. On device, classification becomes tokenize ->
+gather rows -> mean -> normalize -> dot product, with no inference runtime.
+
+Requirements:
+    pip install model2vec[distill] numpy
+
+Usage:
+    python distill_model2vec.py
+
+Output:
+    - minilm_m2v/ (model2vec model: embeddings, tokenizer, config)
+    - minilm_m2v_embeddings.npz (per-row int8 token table + fp16 scales)
+    - scam_embeddings_m2v.npy (scam pattern embeddings)
+    - legitimate_embeddings_m2v.npy (legitimate pattern embeddings)
+"""
+
+import os
+import numpy as np
+from model2vec.distill import distill
+from _prototypes import quantize_rows_int8
+from patterns import scam_patterns, legitimate_patterns
+
+print("=" * 70)
+print("MiniLM-L6-v2 Static Embedding Distiller (model2vec)")
+print("=" * 70)
+
+model_name = "sentence-transformers/all-MiniLM-L6-v2"
+PCA_DIMS = 256
+
+# Create output directory
+output_dir = "../app/src/main/assets/models"
+os.makedirs(output_dir, exist_ok=True)
+
+# Distill model
+print(f"\n[1/4] Distilling {model_name} to {PCA_DIMS}-d static embeddings...")
+m2v_model = distill(model_name=model_name, pca_dims=PCA_DIMS)
+
+m2v_dir = os.path.join(output_dir, "minilm_m2v")
+m2v_model.save_pretrained(m2v_dir)
+
+token_table = np.asarray(m2v_model.embedding, dtype=np.float32)
+print(f"[OK] Static model saved to {m2v_dir}")
+print(f"  Token table shape: {token_table.shape}")
+
+# Quantize token table for on-device gather
+print("\n[2/4] Quantizing token table to int8...")
+
+# Per-row symmetric int8 with fp16 scales
+q, scale = quantize_rows_int8(token_table)
+table_path = os.path.join(output_dir, "minilm_m2v_embeddings.npz")
+np.savez(table_path, q=q, scale=scale)
+
+print(f"[OK] int8 token table saved to {table_path}")
+print(f"  Size: {os.path.getsize(table_path) / (1024 * 1024):.2f} MB")
+
+# Encode reference patterns
+print("\n[3/4] Encoding reference patterns...")
+
+all_embeddings = m2v_model.encode(scam_patterns + legitimate_patterns).astype(np.float32)
+all_embeddings /= np.linalg.norm(all_embeddings, axis=1, keepdims=True)
+scam_embeddings, legitimate_embeddings = np.split(all_embeddings, [len(scam_patterns)])
+
+np.save(os.path.join(output_dir, "scam_embeddings_m2v.npy"), scam_embeddings)
+np.save(os.path.join(output_dir, "legitimate_embeddings_m2v.npy"), legitimate_embeddings)
+
+print(f"[OK] Scam patterns: {len(scam_patterns)} embeddings saved")
+print(f"[OK] Legitimate patterns: {len(legitimate_patterns)} embeddings saved")
+
+# Test encoding
+test_text = "Your account will be suspended unless you verify your information"
+test_embedding = m2v_model.encode([test_text]).astype(np.float32)
+test_embedding /= np.linalg.norm(test_embedding, axis=1, keepdims=True)
+
+scam_sim = (test_embedding @ scam_embeddings.T).max()
+legit_sim = (test_embedding @ legitimate_embeddings.T).max()
+print(f"  Scam similarity: {scam_sim:.3f}")
+print(f"  Legitimate similarity: {legit_sim:.3f}")
+print(f"  Classification: {'SCAM' if scam_sim > legit_sim else 'LEGITIMATE'}")
+
+# Summary
+print("\n[4/4] Summary")
+print("=" * 70)
+print(f"[OK] Static model: {m2v_dir}/")
+print(f"[OK] int8 token table: {table_path}")
+print(f"[OK] Scam embeddings: {output_dir}/scam_embeddings_m2v.npy")
+print(f"[OK] Legitimate embeddings: {output_dir}/legitimate_embeddings_m2v.npy")
+print(f"  Embedding dimension: {PCA_DIMS}")
+print("\nOn-device pipeline: tokenize -> gather int8 rows -> mean -> normalize -> dot")
+print("No ONNX Runtime or TFLite session is required for this path.")
+print("=" * 70)
@@ -0,0 +1,71 @@
+# coding: utf-8
+"""
+Reference scam and legitimate call patterns.
+
+Shared by the embedding generator scripts so every exported table is built
+from the same prototype sentences.
+"""
+
+scam_patterns = [
+    # Lottery/Prize scams
+    "Congratulations! You've won a prize in a lottery you never entered",
+    "You are the lucky winner of our grand prize draw",
+    "Claim your prize money by calling this number immediately",
+
+    # Financial fraud
+    "Your bank account has been suspended due to suspicious activity",
+    "We need to verify your credit card information right now",
+    "Your account will be closed unless you provide your details",
+
+    # IRS/Tax scams
+    "This is the IRS calling about unpaid taxes and penalties",
+    "You have a warrant for your arrest due to tax fraud",
+    "Pay your tax debt immediately or face legal consequences",
+
+    # Tech support scams
+    "Your computer has been infected with a dangerous virus",
+    "This is Microsoft technical support calling about your Windows license",
+    "We detected suspicious activity on your computer and need remote access",
+
+    # Gift card scams
+    "Pay the fine using iTunes gift cards or Google Play cards",
+    "Purchase prepaid cards and provide the codes to resolve this",
+    "Wire transfer or gift cards are the only accepted payment methods",
+
+    # Investment scams
+    "Guaranteed returns on this exclusive investment opportunity",
+    "Double your money with our cryptocurrency trading system",
+    "Limited time offer for high-return investments with no risk",
+
+    # Grandparent scams
+    "Grandma, it's me, I'm in trouble and need money urgently",
+    "Your grandson has been arrested and needs bail money immediately",
+    "Family emergency - send money right away, don't tell anyone",
+
+    # Impersonation
+    "This is an official government agency calling about your benefits",
+    "Federal officer calling regarding a legal matter in your name",
+    "Social Security Administration - your number has been suspended"
+]
+
+legitimate_patterns = [
+    # Work/Professional
+    "Hi, this is John from the office calling about tomorrow's meeting",
+    "Following up on the project we discussed last week",
+    "Calling to schedule our quarterly review appointment",
+
+    # Personal/Family
+    "Hey, it's Sarah! Just wanted to catch up and see how you're doing",
+    "Mom calling to check in and see if you're free for dinner",
+    "Your friend calling about the weekend plans we made",
+
+    # Business/Services
+    "This is your bank calling to verify a recent transaction on your account",
+    "Appointment reminder for your doctor's visit tomorrow at 2 PM",
+    "Your package delivery is scheduled for this afternoon",
+
+    # Legitimate promotions
+    "Thank you for being a valued customer, here's an exclusive offer",
+    "Your subscription renewal is coming up next month",
+    "Confirmation call for your recent online order"
+]